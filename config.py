@@ -1,17 +1,87 @@
+import os
 import subprocess
 import sys
 import platform
 
 
-def install_package(package):
+def install_package(package, extra_args=None, env=None):
     """
     Install a Python package using pip.
+
+    :return: True if the package was installed, False otherwise.
     """
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *(extra_args or []), package], env=env)
         print(f"'{package}' installed successfully.")
+        return True
     except subprocess.CalledProcessError:
         print(f"Failed to install '{package}'. Please install it manually.")
+        return False
+
+
+def cpu_supports_avx2():
+    """
+    Check whether the CPU advertises AVX2 support (Linux only).
+    """
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            return " avx2" in cpuinfo.read()
+    except OSError:
+        return False
+
+
+def install_pillow_simd():
+    """
+    Install Pillow-SIMD in place of Pillow, falling back to stock Pillow if the build fails.
+    Pillow-SIMD is built from source, so an AVX2-enabled build is requested when the CPU supports it.
+    """
+    # Pillow-SIMD shares the PIL namespace with Pillow, so the two can't be installed side by side
+    subprocess.run([sys.executable, "-m", "pip", "uninstall", "-y", "pillow"])
+
+    env = dict(os.environ)
+    if cpu_supports_avx2():
+        env["CC"] = "cc -mavx2"
+    if not install_package("pillow-simd", ["--no-binary=:all:"], env=env):
+        print("Falling back to the standard Pillow package.")
+        install_package("pillow")
+
+
+def build_recolor_extension():
+    """
+    Compile the optional Cython recolor kernel in place. The converter only uses it when Numba isn't available.
+    """
+    if not (install_package("cython") and install_package("setuptools")):
+        return
+    try:
+        subprocess.check_call([sys.executable, "setup.py", "build_ext", "--inplace"], cwd=os.path.dirname(os.path.abspath(__file__)))
+        print("Cython recolor kernel built successfully.")
+    except subprocess.CalledProcessError:
+        print("Failed to build the Cython recolor kernel. Recoloring will use Numba, or NumPy if Numba isn't available.")
+
+
+def get_linux_distribution():
+    """
+    Get the ID of the Linux distribution, followed by the IDs of the distributions it is based on.
+    platform.linux_distribution() was removed in Python 3.8, so use the distro package,
+    or read /etc/os-release directly if it isn't installed.
+
+    :return: A lowercase string such as "ubuntu debian", or "" if it can't be determined.
+    """
+    try:
+        import distro
+        return f"{distro.id()} {distro.like()}".strip().lower()
+    except ImportError:
+        pass
+
+    fields = {}
+    try:
+        with open("/etc/os-release") as os_release:
+            for line in os_release.read().split("\n"):
+                key, _, value = line.partition("=")
+                fields[key] = value.strip('"')
+    except OSError:
+        return ""
+    return f"{fields.get('ID', '')} {fields.get('ID_LIKE', '')}".strip().lower()
 
 
 def check_and_install_tkinter():
@@ -26,12 +96,12 @@ def check_and_install_tkinter():
         except ImportError:
             print("tkinter is not installed. Attempting to install it...")
             # Check the Linux distribution and install tkinter using the appropriate package manager
-            distro = platform.linux_distribution()[0].lower()
-            if "ubuntu" in distro or "debian" in distro:
+            distro_name = get_linux_distribution()
+            if "ubuntu" in distro_name or "debian" in distro_name:
                 subprocess.run(["sudo", "apt", "install", "-y", "python3-tk"], check=True)
-            elif "fedora" in distro or "redhat" in distro:
+            elif "fedora" in distro_name or "redhat" in distro_name or "rhel" in distro_name:
                 subprocess.run(["sudo", "dnf", "install", "-y", "python3-tkinter"], check=True)
-            elif "arch" in distro:
+            elif "arch" in distro_name:
                 subprocess.run(["sudo", "pacman", "-S", "--noconfirm", "tk"], check=True)
             else:
                 print("Please install 'tkinter' manually for your Linux distribution.")
@@ -48,10 +118,14 @@ def main():
         print("Failed to update pip. Please update it manually.")
 
     # Install required Python packages
-    required_packages = ["pillow"]
+    install_pillow_simd()
+    required_packages = ["numpy", "numba", "opencv-python-headless", "distro"]
     for package in required_packages:
         install_package(package)
 
+    # Build the compiled recolor kernel
+    build_recolor_extension()
+
     # Check for tkinter on Linux systems
     check_and_install_tkinter()
 
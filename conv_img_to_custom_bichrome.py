@@ -1,6 +1,177 @@
+#!/usr/bin/env -S PYTHON_JIT=1 python3
 import os
-from tkinter import Tk, filedialog, colorchooser
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from PIL import Image
+import numpy as np
+
+# Grayscale values above this are treated as white, the rest as black
+THRESHOLD = 128
+
+# File extensions picked up when processing a folder
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".bmp", ".gif"})
+
+# Limits on a single batch of same-sized images when processing a folder. Each pool worker
+# holds one batch at a time, as a grayscale stack plus its RGB output (4 bytes per pixel),
+# so MAX_BATCH_PIXELS caps a worker at about 64 MB (or a single image, if that is larger).
+MAX_BATCH_SIZE = 8
+MAX_BATCH_PIXELS = 16 * 1024 * 1024
+
+# OpenCV is optional: when available, it decodes images straight into a grayscale array
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# The compiled Cython kernel is optional (built by config.py via setup.py); it runs on a single
+# thread, so it is only used when Numba isn't available
+try:
+    from recolor import recolor
+except ImportError:
+    recolor = None
+
+# Numba is optional: when available, thresholding and recoloring run as one fused, multithreaded pass
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def threshold_and_color(gray, out, black, white, thresh):
+        """
+        Write black or white into out for every pixel of gray, depending on whether it exceeds thresh.
+
+        :param gray: 2D uint8 array of grayscale values.
+        :param out: Preallocated (height, width, 3) uint8 array receiving the RGB output.
+        :param black: uint8 array with the RGB color for pixels at or below the threshold.
+        :param white: uint8 array with the RGB color for pixels above the threshold.
+        :param thresh: Grayscale threshold value.
+        """
+        for y in numba.prange(gray.shape[0]):
+            for x in range(gray.shape[1]):
+                c = white if gray[y, x] > thresh else black
+                out[y, x, 0] = c[0]
+                out[y, x, 1] = c[1]
+                out[y, x, 2] = c[2]
+
+def load_grayscale(image_path):
+    """
+    Load an image as a 2D uint8 array of grayscale values.
+
+    :param image_path: Path to the input image.
+    :return: A (height, width) uint8 array.
+    """
+    if cv2 is not None:
+        # imread returns None for formats OpenCV can't decode (e.g. GIF), so fall back to Pillow.
+        # IMREAD_GRAYSCALE is avoided because libpng's own gray conversion uses different weights
+        # than Pillow's "L" mode; cvtColor matches them. Other bit depths are left to Pillow.
+        image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+        if image is not None and image.dtype == np.uint8:
+            if image.ndim == 2:
+                return image  # Already grayscale
+            if image.shape[2] == 3:
+                return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            if image.shape[2] == 4:
+                return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+
+    with Image.open(image_path) as image:
+        # Skip the conversion copy when the image is already grayscale
+        gray_image = image if image.mode == "L" else image.convert("L")
+        return np.asarray(gray_image)
+
+def colorize(gray, black_arr, white_arr):
+    """
+    Threshold grayscale values and replace black and white with the specified colors.
+
+    :param gray: uint8 array of grayscale values, either one (height, width) image
+                 or a (count, height, width) stack of same-sized images.
+    :param black_arr: Color to replace black, as a uint8 array of 3 RGB values.
+    :param white_arr: Color to replace white, as a uint8 array of 3 RGB values.
+    :return: A uint8 array shaped like gray with a trailing RGB axis.
+    """
+    if recolor is not None or numba is not None:
+        # Threshold and recolor in a single pass over the grayscale buffer. The kernels walk
+        # 2D buffers, so a stack is viewed as one tall image.
+        kernel = threshold_and_color if numba is not None else recolor
+        rows = gray.reshape(-1, gray.shape[-1])
+        out = np.empty(rows.shape + (3,), dtype=np.uint8)
+        kernel(rows, out, black_arr, white_arr, THRESHOLD)
+        return out.reshape(gray.shape + (3,))
+
+    # Look every grayscale value up in a 256-entry color table with the threshold baked in,
+    # so no black and white mask is ever materialized
+    lut = np.empty((256, 3), dtype=np.uint8)
+    lut[:THRESHOLD + 1] = black_arr
+    lut[THRESHOLD + 1:] = white_arr
+    return lut.take(gray, axis=0)
+
+def recolor_grayscale(gray, black_arr, white_arr, resize_dim=None):
+    """
+    Threshold a grayscale array and replace black and white with the specified colors.
+
+    :param gray: 2D uint8 array of grayscale values, as returned by load_grayscale.
+    :param black_arr: Color to replace black, as a uint8 array of 3 RGB values.
+    :param white_arr: Color to replace white, as a uint8 array of 3 RGB values.
+    :param resize_dim: Optional tuple (width, height) to resize the image.
+    :return: The recolored RGB image.
+    """
+    return _to_image(colorize(gray, black_arr, white_arr), resize_dim)
+
+def palette_image(gray, black_arr, white_arr):
+    """
+    Threshold a grayscale array into a 2-color palette image with the specified colors.
+
+    :param gray: 2D uint8 array of grayscale values, as returned by load_grayscale.
+    :param black_arr: Color to replace black, as a uint8 array of 3 RGB values.
+    :param white_arr: Color to replace white, as a uint8 array of 3 RGB values.
+    :return: A "P" mode image whose palette index 0 is black_arr and index 1 is white_arr.
+    """
+    image = Image.fromarray((gray > THRESHOLD).view(np.uint8))
+    image.putpalette(bytes(black_arr) + bytes(white_arr))
+    return image
+
+def _saves_as_palette(output_path, cleanup=False, resize_dim=None):
+    """
+    Whether the output is a cleaned-up PNG that can be written as a 2-color palette image.
+    Resized output is excluded, since resampling adds intermediate colors along the edges.
+    """
+    return cleanup and not resize_dim and os.path.splitext(output_path)[1].lower() == ".png"
+
+def _to_image(out, resize_dim=None):
+    """
+    Wrap a (height, width, 3) uint8 array in an RGB image, resizing it if specified.
+    """
+    replaced_image = Image.fromarray(out, "RGB")
+
+    # Resize the image if specified. reducing_gap lets Pillow box-reduce large downscales
+    # by an integer factor first, so the Lanczos filter only runs over the last 2x.
+    # (thumbnail() would do the same but also preserves aspect ratio, changing the output size.)
+    if resize_dim:
+        replaced_image = replaced_image.resize(resize_dim, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    return replaced_image
+
+def save_image(image, output_path, cleanup=False):
+    """
+    Save a processed image.
+
+    :param image: The image to save.
+    :param output_path: Path to save the output image.
+    :param cleanup: If True, performs cleanup by removing metadata and compressing the image.
+    """
+    if cleanup:
+        extension = os.path.splitext(output_path)[1].lower()
+        if extension in (".jpg", ".jpeg"):
+            # A second Huffman pass (optimize) roughly doubles encode time for little gain,
+            # and two-color output loses nothing visible to 4:2:0 chroma subsampling
+            image.save(output_path, quality=80, optimize=False, progressive=False, subsampling=2)
+        else:
+            image.save(output_path, optimize=True, quality=85)  # Compressed output
+    else:
+        image.save(output_path)  # Standard output
+
+    print(f"Processed image saved to {output_path}")
 
 def replace_colors(image_path, black_color, white_color, output_path, cleanup=False, resize_dim=None):
     """
@@ -13,57 +184,128 @@ def replace_colors(image_path, black_color, white_color, output_path, cleanup=Fa
     :param cleanup: If True, performs cleanup by removing metadata and compressing the image.
     :param resize_dim: Optional tuple (width, height) to resize the image.
     """
-    image = Image.open(image_path)
-
-    # Convert the image to black and white
-    bw_image = image.convert("L")
-    threshold = 128
-    bw_image = bw_image.point(lambda x: 255 if x > threshold else 0, '1')
-
-    # Convert black and white to RGB for color replacement
-    bw_image = bw_image.convert("RGB")
+    black_arr = np.array(black_color, dtype=np.uint8)
+    white_arr = np.array(white_color, dtype=np.uint8)
+    gray = load_grayscale(image_path)
+    if _saves_as_palette(output_path, cleanup, resize_dim):
+        replaced_image = palette_image(gray, black_arr, white_arr)
+    else:
+        replaced_image = recolor_grayscale(gray, black_arr, white_arr, resize_dim)
+    save_image(replaced_image, output_path, cleanup)
 
-    def replace_pixel_color(pixel):
-        if pixel == (255, 255, 255):  # White
-            return white_color
-        elif pixel == (0, 0, 0):  # Black
-            return black_color
-        return pixel
+def _init_worker():
+    """
+    Limit each pool worker to one Numba thread, since the pool already keeps every core busy.
+    """
+    if numba is not None:
+        numba.set_num_threads(1)
 
-    replaced_image = Image.new("RGB", bw_image.size)
-    pixels = bw_image.load()
+def _group_by_size(paths):
+    """
+    Group (input_path, output_path) pairs by image size, reading only the image headers.
 
-    for y in range(bw_image.size[1]):
-        for x in range(bw_image.size[0]):
-            replaced_image.putpixel((x, y), replace_pixel_color(pixels[x, y]))
+    :return: A dict mapping (width, height) to a list of path pairs.
+    """
+    groups = {}
+    for input_path, output_path in paths:
+        try:
+            with Image.open(input_path) as image:
+                size = image.size
+        except Exception as e:  # e.g. OSError, or DecompressionBombError for oversized images
+            print(f"Failed to read {input_path}: {e}")
+            continue
+        groups.setdefault(size, []).append((input_path, output_path))
+    return groups
 
-    # Resize the image if specified
-    if resize_dim:
-        replaced_image = replaced_image.resize(resize_dim, Image.ANTIALIAS)
+def _process_batch(size, batch, black_arr, white_arr, cleanup=False, resize_dim=None):
+    """
+    Pool worker: decode a batch of same-sized images into one contiguous (count, height, width)
+    stack, recolor the stack in one pass, and save each result.
 
-    # Save the image with cleanup
-    if cleanup:
-        replaced_image.save(output_path, optimize=True, quality=85)  # Compressed output
-    else:
-        replaced_image.save(output_path)  # Standard output
+    :param size: The (width, height) shared by every image in the batch.
+    :param batch: List of (input_path, output_path) pairs.
+    """
+    width, height = size
+    stack = np.empty((len(batch), height, width), dtype=np.uint8)
+    output_paths = []
+    for input_path, output_path in batch:
+        try:
+            stack[len(output_paths)] = load_grayscale(input_path)
+        except Exception as e:  # Report and skip the file rather than failing the whole batch
+            print(f"Failed to read {input_path}: {e}")
+            continue
+        output_paths.append(output_path)
+    if not output_paths:
+        return
+    stack = stack[:len(output_paths)]
 
-    print(f"Processed image saved to {output_path}")
+    # Recolor the whole stack in one pass, unless every image is saved as a palette image
+    as_palette = [_saves_as_palette(output_path, cleanup, resize_dim) for output_path in output_paths]
+    rgb_stack = None if all(as_palette) else colorize(stack, black_arr, white_arr)
+    for i, output_path in enumerate(output_paths):
+        try:
+            if as_palette[i]:
+                image = palette_image(stack[i], black_arr, white_arr)
+            else:
+                image = _to_image(rgb_stack[i], resize_dim)
+            save_image(image, output_path, cleanup)
+        except Exception as e:  # Report and skip the file rather than failing the whole batch
+            print(f"Failed to save {output_path}: {e}")
 
 def process_images_in_folder(folder_path, black_color, white_color, cleanup=False, resize_dim=None):
     """
     Process all images in a folder with optional cleanup.
 
+    Images are grouped into batches of same-sized images, and each pool worker decodes,
+    recolors and saves a whole batch, so decoding and encoding run in parallel as well.
+
     :param cleanup: If True, performs cleanup by removing metadata and compressing the images.
     :param resize_dim: Optional tuple (width, height) to resize the images.
     """
     output_folder = os.path.join(folder_path, "processed_images")
     os.makedirs(output_folder, exist_ok=True)
 
-    for file_name in os.listdir(folder_path):
-        if file_name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-            input_path = os.path.join(folder_path, file_name)
-            output_path = os.path.join(output_folder, file_name)
-            replace_colors(input_path, black_color, white_color, output_path, cleanup, resize_dim)
+    with os.scandir(folder_path) as entries:
+        paths = [
+            (entry.path, os.path.join(output_folder, entry.name))
+            for entry in entries
+            if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS and entry.is_file()
+        ]
+
+    # The colors are the same for every image, so convert them once
+    black_arr = np.array(black_color, dtype=np.uint8)
+    white_arr = np.array(white_color, dtype=np.uint8)
+
+    workers = os.cpu_count() or 1
+    batches = []
+    for size, group in _group_by_size(paths).items():
+        # Split each group into enough batches to give every worker something to do,
+        # without letting large images push a batch past the pixel budget
+        width, height = size
+        batch_size = max(1, min(MAX_BATCH_SIZE, MAX_BATCH_PIXELS // (width * height), -(-len(group) // workers)))
+        for start in range(0, len(group), batch_size):
+            batches.append((size, group[start:start + batch_size]))
+
+    # Spawned workers don't inherit any of this process's threads or locks. Unlike
+    # multiprocessing.Pool, the executor raises BrokenProcessPool if a worker dies
+    # (e.g. killed for running out of memory) instead of waiting on it forever.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(_process_batch, size, batch, black_arr, white_arr, cleanup, resize_dim)
+            for size, batch in batches
+        ]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            # A worker died or the run was interrupted: cancel the remaining batches and stop
+            # the workers, rather than letting the pool wait for them on the way out
+            for future in futures:
+                future.cancel()
+            for process in multiprocessing.active_children():
+                process.terminate()
+            raise
 
     print(f"All images processed and saved to {output_folder}")
 
@@ -81,6 +323,7 @@ def pick_color_or_default(prompt, default_color):
         use_picker = input(f"Do you want to use the color picker for {prompt}? (yes or no): ").strip().lower()
         if use_picker == "yes":
             # Open color picker
+            from tkinter import colorchooser
             color_code = colorchooser.askcolor(title=f"Select a color to replace {prompt}")
             if color_code[0]:
                 return tuple(map(int, color_code[0]))  # Convert to RGB tuple
@@ -104,7 +347,10 @@ def pick_color_or_default(prompt, default_color):
         return default_color
 
 def main():
-    # Initialize the Tkinter GUI (no visible window)
+    # Initialize the Tkinter GUI (no visible window). Tkinter is imported here rather than at
+    # module level so pool workers importing this module don't pay the Tcl/Tk load cost.
+    from tkinter import Tk, filedialog
+
     root = Tk()
     root.withdraw()
 
@@ -0,0 +1,37 @@
+# cython: language_level=3
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef recolor(const unsigned char[:, ::1] gray, unsigned char[:, :, ::1] out,
+              const unsigned char[::1] black, const unsigned char[::1] white, int thresh):
+    """
+    Write black or white into out for every pixel of gray, depending on whether it exceeds thresh.
+
+    :param gray: 2D uint8 array of grayscale values.
+    :param out: Preallocated (height, width, 3) uint8 array receiving the RGB output.
+    :param black: uint8 array with the RGB color for pixels at or below the threshold.
+    :param white: uint8 array with the RGB color for pixels above the threshold.
+    :param thresh: Grayscale threshold value.
+    """
+    cdef Py_ssize_t y, x
+    cdef Py_ssize_t height = gray.shape[0]
+    cdef Py_ssize_t width = gray.shape[1]
+    cdef unsigned char[3] black_c
+    cdef unsigned char[3] white_c
+    cdef unsigned char *c
+    cdef unsigned char g
+
+    for x in range(3):
+        black_c[x] = black[x]
+        white_c[x] = white[x]
+
+    with nogil:
+        for y in range(height):
+            for x in range(width):
+                g = gray[y, x]
+                c = &white_c[0] if g > thresh else &black_c[0]
+                out[y, x, 0] = c[0]
+                out[y, x, 1] = c[1]
+                out[y, x, 2] = c[2]
@@ -0,0 +1,12 @@
+"""
+Build the optional Cython recolor kernel in place:
+
+    python setup.py build_ext --inplace
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="recolor",
+    ext_modules=cythonize("recolor.pyx"),
+)